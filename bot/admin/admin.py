@@ -1,18 +1,28 @@
 """Contains a Cog for all administrative funcionality."""
 
-import json
-from datetime import datetime
-from typing import Optional, Mapping
+import asyncio
+import collections
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Mapping, Set, Tuple, Type
 
 import discord
-import requests
+import orjson
 from discord.ext import commands
 
-from bot import constants
+from bot import constants, singletons
 from bot.logger import command_log, log
 from bot.persistence import DatabaseConnector
 
 
+# Streaming platforms supported by Discord, consisting of a part of their URL and the name of the platform.
+_STREAM_PLATFORMS = (("twitch", "Twitch"), ("youtube", "YouTube"))
+
+# Raw pastebin content by URL, stored together with the time it has been fetched. Ordered from least to most recently
+# used, so the first entry is the one to evict once the cache is full.
+_PASTEBIN_CACHE: 'collections.OrderedDict[str, Tuple[float, bytes]]' = collections.OrderedDict()
+
+
 # disables too many public methods for now TODO: fix this (maybe with mixins)
 # pylint: disable=R0904
 class AdminCog(commands.Cog):
@@ -25,14 +35,70 @@ class AdminCog(commands.Cog):
             bot (discord.ext.commands.Bot): The bot for which this cog should be enabled.
         """
         self.bot = bot
-        self._db_connector = DatabaseConnector(constants.DB_FILE_PATH, constants.DB_INIT_SCRIPT)
+
+        # IDs of all bot-only channels, kept in memory because they are needed for every single message.
+        self._botonly_channels: Set[int] = set()
+
+        # Opening and initializing the database happens in a worker thread, so loading this Cog doesn't block the event
+        # loop. Everything using the database has to await this task, which results in the db connector.
+        self._db_initialization = bot.loop.create_task(self._initialize_database())
+
+        # IDs of the bot owners, which are the only ones allowed to use this Cog. Fetched once on first use.
+        self._owner_ids: Set[int] = set()
+
+        # Status list of all Cogs, which only needs to be rebuilt if one of them has been (un-/re)loaded.
+        self._cogs_embed_cache: Optional[str] = None
 
         # Channel instances
         self.ch_bot = bot.get_guild(int(constants.SERVER_ID)).get_channel(int(constants.CHANNEL_ID_BOT))
 
+    async def _initialize_database(self) -> DatabaseConnector:
+        """Method for initializing the database and loading the bot-only channels without blocking the event loop.
+
+        Returns:
+            DatabaseConnector: The connector used by this Cog.
+        """
+        loop = asyncio.get_running_loop()
+        db_connector = await loop.run_in_executor(None, DatabaseConnector, constants.DB_FILE_PATH,
+                                                  constants.DB_INIT_SCRIPT)
+        self._botonly_channels = set(await loop.run_in_executor(None, db_connector.get_botonly_channel_ids))
+
+        return db_connector
+
+    # A special method that is called when the cog gets unloaded. The connections to the database are closed only after
+    # all pending changes have been committed, which is why the connector needs to be awaited first.
+    def cog_unload(self):
+        self.bot.loop.create_task(self._close_database())
+
+    async def _close_database(self):
+        """Method for closing the database connector of this Cog once its initialization has finished."""
+        db_connector = await self._db_initialization
+        await db_connector.close_async()
+
     # A special method that registers as a commands.check() for every command and subcommand in this cog.
     async def cog_check(self, ctx):
-        return await self.bot.is_owner(ctx.author)  # Only owners of the bot can use the commands defined in this Cog.
+        if not self._owner_ids:
+            self._owner_ids = await self._get_owner_ids()
+        return ctx.author.id in self._owner_ids  # Only owners of the bot can use the commands defined in this Cog.
+
+    async def _get_owner_ids(self) -> Set[int]:
+        """Method for determining the IDs of all owners of the bot.
+
+        Uses the owners configured for the bot if there are any. Otherwise they will be taken from the application info,
+        which contains either a single owner or all members of the team owning the application.
+
+        Returns:
+            Set[int]: A set containing the IDs of all owners of the bot.
+        """
+        if self.bot.owner_id:
+            return {self.bot.owner_id}
+        if self.bot.owner_ids:
+            return set(self.bot.owner_ids)
+
+        app_info = await self.bot.application_info()
+        if app_info.team:
+            return {member.id for member in app_info.team.members}
+        return {app_info.owner.id}
 
     @commands.command(name="echo", hidden=True)
     @command_log
@@ -82,9 +148,8 @@ class AdminCog(commands.Cog):
             channel (str): The channel where to post the message. Can be channel name (starting with #) or channel id.
             json_string (str): The json string representing the embed. Alternatively it could also be a pastebin link.
         """
-        if is_pastebin_link(json_string):
-            json_string = parse_pastebin_link(json_string)
-        embed_dict = json.loads(json_string)
+        embed_data = await parse_pastebin_link(json_string) if is_pastebin_link(json_string) else json_string
+        embed_dict = orjson.loads(embed_data)
         embed = discord.Embed.from_dict(embed_dict)
         await channel.send(embed=embed)
 
@@ -132,9 +197,8 @@ class AdminCog(commands.Cog):
             raise commands.BadArgument("Can only edit message from bot user. The message was from: {0}".format(
                 str(message.author)))
 
-        if is_pastebin_link(new_embed):
-            new_embed = parse_pastebin_link(new_embed)
-        embed_dict = json.loads(new_embed)
+        embed_data = await parse_pastebin_link(new_embed) if is_pastebin_link(new_embed) else new_embed
+        embed_dict = orjson.loads(embed_data)
         embed = discord.Embed.from_dict(embed_dict)
         # Only first embed will be replaced.
         await message.edit(content=message.content, embed=embed)
@@ -153,33 +217,13 @@ class AdminCog(commands.Cog):
             error (commands.CommandError): The error raised during the execution of the command.
         """
         root_error = error if not isinstance(error, commands.CommandInvokeError) else error.original
-        error_type = type(root_error)
-
-        # put custom Error Handlers here
-        async def handle_http_exception(ctx: commands.Context, _error: discord.HTTPException):
-            await ctx.send(
-                'Der übergebene JSON-String war entweder leer oder eines der Felder besaß einen ungültigen Typ.\n' +
-                'Du kannst dein JSON auf folgender Seite validieren und gegebenenfalls anpassen: ' +
-                'https://leovoel.github.io/embed-visualizer/.')
-
-        async def handle_json_decode_error(ctx: commands.Context, error: json.JSONDecodeError):
-            await ctx.send(
-                "Der übergebene JSON-String konnte nicht geparsed werden. Hier die erhaltene Fehlermeldung:\n{0}".format(
-                    str(error)))
-
-        async def handle_bad_argument_error(ctx: commands.Context, _error: commands.BadArgument):
-            await ctx.send(
-                "Tut mir leid, aber anscheinend gibt es Probleme mit der von dir angegebenen ID. Bist du dir sicher "
-                "dass du die richtige kopiert hast?")
-
-        handler_mapper = {
-            discord.errors.HTTPException: handle_http_exception,
-            json.JSONDecodeError: handle_json_decode_error,
-            commands.BadArgument: handle_bad_argument_error
-        }
-
-        if error_type in handler_mapper:
-            await handler_mapper[error_type](ctx, root_error)
+
+        # Walking the MRO makes sure that subclasses (e.g. discord.Forbidden) are handled by their closest handler.
+        for error_type in type(root_error).__mro__:
+            handler = _EMBED_ERROR_HANDLERS.get(error_type)
+            if handler is not None:
+                await handler(ctx, root_error)
+                return
 
     @commands.group(name="bot", hidden=True, invoke_without_command=True)
     @command_log
@@ -207,12 +251,14 @@ class AdminCog(commands.Cog):
         Args:
             _ctx (discord.ext.commands.Context): The context from which this command is invoked.
         """
-        str_cogs = _create_cogs_embed_string(self.bot.cogs)
+        if self._cogs_embed_cache is None:
+            self._cogs_embed_cache = _create_cogs_embed_string(self.bot.cogs)
+        str_cogs = self._cogs_embed_cache
         description = "Auflistung sämtlich vorhandener \"Cogs\" des Bots. Die Farbe vor den Namen signalisiert, ob " \
                       "die jeweilige Erweiterung momentan geladen ist oder nicht."
 
         embed = discord.Embed(title="Verfügbare \"Cogs\"", color=constants.EMBED_COLOR_SYSTEM, description=description,
-                              timestamp=datetime.utcnow())
+                              timestamp=datetime.now(timezone.utc))
         embed.set_footer(text="Erstellt am")
         embed.add_field(name="Status", value=str_cogs)
 
@@ -244,6 +290,7 @@ class AdminCog(commands.Cog):
         extn_name = _get_cog_name(extn_name)
 
         self.bot.load_extension(constants.INITIAL_EXTNS[extn_name])
+        self._cogs_embed_cache = None
         log.warning("%s has been loaded.", extn_name)
         await self.ch_bot.send(f":arrow_heading_down: `{extn_name}` has been successfully loaded.")
 
@@ -261,6 +308,7 @@ class AdminCog(commands.Cog):
         extn_name = _get_cog_name(extn_name)
 
         self.bot.unload_extension(constants.INITIAL_EXTNS[extn_name])
+        self._cogs_embed_cache = None
         log.warning("%s has been unloaded.", extn_name)
         await self.ch_bot.send(f":arrow_heading_up: `{extn_name}` has been successfully unloaded.")
 
@@ -279,6 +327,7 @@ class AdminCog(commands.Cog):
         extn_name = _get_cog_name(extn_name)
 
         self.bot.reload_extension(constants.INITIAL_EXTNS[extn_name])
+        self._cogs_embed_cache = None
         log.warning("%s has been reloaded.", extn_name)
         await self.ch_bot.send(f":arrows_counterclockwise: `{extn_name}` has been successfully reloaded.")
 
@@ -297,6 +346,11 @@ class AdminCog(commands.Cog):
             self.bot.reload_extension(path)
             log.warning("%s has been reloaded.", cog_name)
 
+            # Reloading modifies the bot itself and therefore has to happen on the event loop, but other events can
+            # still be processed between two Cogs.
+            await asyncio.sleep(0)
+        self._cogs_embed_cache = None
+
         await self.ch_bot.send(":arrows_counterclockwise: All cogs have been successfully reloaded.")
 
     @load_extension.error
@@ -315,6 +369,33 @@ class AdminCog(commands.Cog):
         if isinstance(error, commands.CommandInvokeError) and isinstance(error.original, KeyError):
             await self.ch_bot.send("Es konnte leider kein Cog mit diesem Namen gefunden werden.")
 
+    @cmd_for_bot_stuff.group(name="pastebin-cache", invoke_without_command=True)
+    @command_log
+    async def pastebin_cache(self, ctx: commands.Context):
+        """Command handler for the `bot` subcommand group `pastebin-cache`.
+
+        This group contains subcommands for managing the cache of resolved pastebin links.
+
+        Args:
+            ctx (discord.ext.commands.Context): The context from which this command is invoked.
+        """
+        await ctx.send_help(ctx.command)
+
+    @pastebin_cache.command(name="clear")
+    @command_log
+    async def clear_pastebin_cache(self, ctx: commands.Context):
+        """Command handler for the `bot pastebin-cache` subcommand `clear`.
+
+        Removes all cached pastebin contents, so the next use of a link fetches it again. This is needed if a paste has
+        been edited in the meantime.
+
+        Args:
+            ctx (discord.ext.commands.Context): The context from which this command is invoked.
+        """
+        _PASTEBIN_CACHE.clear()
+        log.info("The pastebin cache has been cleared by %s", ctx.author)
+        await ctx.send(":white_check_mark: Der Pastebin-Cache wurde erfolgreich geleert!")
+
     @cmd_for_bot_stuff.group(name="presence", invoke_without_command=True)
     @command_log
     async def change_discord_presence(self, ctx: commands.Context):
@@ -404,12 +485,7 @@ class AdminCog(commands.Cog):
         # Everything other than Twitch probably won't work because of a clientside bug in Discord.
         # More info here: https://github.com/Rapptz/discord.py/issues/5118
         activity = discord.Streaming(name=activity_name, url=stream_url)
-        if "twitch" in stream_url:
-            activity.platform = "Twitch"
-        elif "youtube" in stream_url:
-            activity.platform = "YouTube"
-        else:
-            activity.platform = None
+        activity.platform = next((platform for needle, platform in _STREAM_PLATFORMS if needle in stream_url), None)
 
         await self.bot.change_presence(activity=activity, status=status)
         await _notify_presence_change(ctx.channel, ctx.author)
@@ -439,15 +515,18 @@ class AdminCog(commands.Cog):
             ctx (discord.ext.commands.Context): The context from which this command is invoked.
             channel (discord.Textchannel): The channel that is to be made bot-only
         """
+        db_connector = await self._db_initialization
         target_channel = channel if channel is not None else ctx.channel
-        is_channel_botonly = self._db_connector.is_botonly(target_channel.id)
+        is_channel_botonly = target_channel.id in self._botonly_channels
 
         if is_channel_botonly:
             log.info("Deactivated bot-only mode for channel [#%s]", target_channel)
-            self._db_connector.deactivate_botonly(target_channel.id)
+            await db_connector.deactivate_botonly_async(target_channel.id)
+            self._botonly_channels.discard(target_channel.id)
         else:
             log.info("Activated bot-only mode for channel [#%s]", target_channel)
-            self._db_connector.activate_botonly(target_channel.id)
+            await db_connector.activate_botonly_async(target_channel.id)
+            self._botonly_channels.add(target_channel.id)
 
         is_enabled_string = 'aktiviert' if not is_channel_botonly else 'deaktiviert'
         embed = _build_botonly_embed(is_enabled_string)
@@ -462,13 +541,19 @@ class AdminCog(commands.Cog):
         Args:
             message (discord.Message): The context this method was called in. Must always be a message.
         """
-        if not message.author.bot and self._db_connector.is_botonly(message.channel.id):
+        if not self._botonly_channels:
+            return
+
+        if message.channel.id in self._botonly_channels and not message.author.bot:
             await message.delete()
 
 
 def is_pastebin_link(json_string: str) -> bool:
-    """Verifies if the string is a link to pastebin.com by checking if it contains 'pastebin.com' and does not contain
-    json specific symbols.
+    """Verifies if the string is a link to pastebin.com by checking if it doesn't start like a json document and
+    contains 'pastebin.com'.
+
+    Only the beginning of the string is searched for 'pastebin.com', since links to pastebin are short and a complete
+    json document doesn't need to be scanned.
 
     Args:
         json_string (str): The string to be checked.
@@ -476,27 +561,79 @@ def is_pastebin_link(json_string: str) -> bool:
     Returns:
           bool: True if it is a link to pastebin.com, False if not.
     """
-    return "pastebin.com" in json_string and not any(x in json_string for x in ("{", "}"))
+    stripped = json_string.lstrip()
+    if stripped[:1] in ("{", "["):
+        return False
+    return "pastebin.com" in stripped[:256]
 
 
-def parse_pastebin_link(url: str) -> str:
+async def parse_pastebin_link(url: str) -> bytes:
     """Resolves a link to pastebin.com and returns the raw data behind it.
         This works with links to the original pastebin (pastebin.com/abc) and to raw links (pastebin.com/raw/abc)
 
+        Already resolved links are cached for a while, so using the same paste multiple times only fetches it once.
+
         Args:
             url (str): The pastebin url to resolve.
 
         Returns:
-            str: The raw data as string behind the link.
+            bytes: The raw data behind the link.
 
         Raises:
-             Error: If the link could not be resolved for any reasons.
+             aiohttp.ClientResponseError: If the link could not be resolved for any reasons.
+             OverflowError: If the paste is bigger than the configured limit.
+    """
+    url = _get_raw_pastebin_url(url)
+
+    cached = _PASTEBIN_CACHE.get(url)
+    if cached is not None and time.monotonic() - cached[0] < constants.TIMEOUT_PASTEBIN_CACHE:
+        _PASTEBIN_CACHE.move_to_end(url)
+        return cached[1]
+
+    async with singletons.HTTP_SESSION.get(url) as response:
+        response.raise_for_status()
+        if (response.content_length or 0) > constants.LIMIT_PASTEBIN_SIZE:
+            raise OverflowError("The paste exceeds the maximum size of {0} bytes.".format(constants.LIMIT_PASTEBIN_SIZE))
+
+        # Read at most one byte more than allowed, which is enough to detect an oversized paste.
+        buffer = bytearray()
+        while len(buffer) <= constants.LIMIT_PASTEBIN_SIZE:
+            chunk = await response.content.read(constants.LIMIT_PASTEBIN_SIZE + 1 - len(buffer))
+            if not chunk:
+                break
+            buffer += chunk
+
+        if len(buffer) > constants.LIMIT_PASTEBIN_SIZE:
+            raise OverflowError("The paste exceeds the maximum size of {0} bytes.".format(constants.LIMIT_PASTEBIN_SIZE))
+        data = bytes(buffer)
+
+    _PASTEBIN_CACHE[url] = (time.monotonic(), data)
+    _PASTEBIN_CACHE.move_to_end(url)
+    if len(_PASTEBIN_CACHE) > constants.LIMIT_PASTEBIN_CACHE:
+        _PASTEBIN_CACHE.popitem(last=False)
+
+    return data
+
+
+def _get_raw_pastebin_url(url: str) -> str:
+    """Method for converting a link to pastebin.com into the link of its raw data.
+
+    Both pastebin.com/abc and pastebin.com/raw/abc result in the same link, so they can share a cache entry.
+
+    Args:
+        url (str): The pastebin url to convert.
+
+    Returns:
+        str: The link to the raw data of the paste.
     """
+    url = url.strip().rstrip("/")
+
     # add raw to url if not contained
     if "raw" not in url:
         split_index = url.find(".com/")
         url = url[:(split_index + 5)] + "raw/" + url[(split_index + 5):]
-    return requests.get(url).text
+
+    return url
 
 
 async def _notify_presence_change(channel: discord.TextChannel, author: discord.Member):
@@ -515,14 +652,12 @@ def _get_cog_name(extn_name: str) -> str:
     Returns:
         str: String containing the desired Cog name.
     """
-    cog_name = extn_name.capitalize()
+    cog_name = extn_name.strip()
 
-    if not cog_name.endswith(("Cog", "cog")):
-        cog_name += "Cog"
-    elif cog_name.endswith("cog"):
-        cog_name = cog_name[:-3] + "Cog"
+    if cog_name[-3:].lower() == "cog":
+        cog_name = cog_name[:-3]
 
-    return cog_name
+    return cog_name.capitalize() + "Cog"
 
 
 def _create_cogs_embed_string(loaded_cogs: Mapping[str, commands.Cog]) -> str:
@@ -537,16 +672,10 @@ def _create_cogs_embed_string(loaded_cogs: Mapping[str, commands.Cog]) -> str:
     Returns:
         str: String containing the list of all Cogs and their current status.
     """
-    string = ""
+    available, unavailable = constants.EMOJI_AVAILABLE, constants.EMOJI_UNAVAILABLE
 
-    for cog in constants.INITIAL_EXTNS:
-        if cog in loaded_cogs.keys():
-            string += constants.EMOJI_AVAILABLE
-        else:
-            string += constants.EMOJI_UNAVAILABLE
-        string += " --> {0}\n".format(cog[:-3])
-
-    return string
+    return "".join(f"{available if cog in loaded_cogs else unavailable} --> {cog[:-3]}\n"
+                   for cog in constants.INITIAL_EXTNS)
 
 
 def _build_botonly_embed(is_enabled_string: str):
@@ -565,6 +694,40 @@ def _build_botonly_embed(is_enabled_string: str):
     return discord.Embed(title=title, description=description, color=constants.EMBED_COLOR_BOTONLY)
 
 
+async def _handle_http_exception(ctx: commands.Context, _error: discord.HTTPException):
+    await ctx.send(
+        'Der übergebene JSON-String war entweder leer oder eines der Felder besaß einen ungültigen Typ.\n' +
+        'Du kannst dein JSON auf folgender Seite validieren und gegebenenfalls anpassen: ' +
+        'https://leovoel.github.io/embed-visualizer/.')
+
+
+async def _handle_json_decode_error(ctx: commands.Context, error: orjson.JSONDecodeError):
+    await ctx.send(
+        "Der übergebene JSON-String konnte nicht geparsed werden. Hier die erhaltene Fehlermeldung:\n{0}".format(
+            str(error)))
+
+
+async def _handle_overflow_error(ctx: commands.Context, _error: OverflowError):
+    await ctx.send(
+        "Der Inhalt des Pastebin-Links ist leider zu groß. Ein Embed darf insgesamt nicht mehr als 6000 Zeichen "
+        "enthalten.")
+
+
+async def _handle_bad_argument_error(ctx: commands.Context, _error: commands.BadArgument):
+    await ctx.send(
+        "Tut mir leid, aber anscheinend gibt es Probleme mit der von dir angegebenen ID. Bist du dir sicher "
+        "dass du die richtige kopiert hast?")
+
+
+# put custom Error Handlers for the embed commands here
+_EMBED_ERROR_HANDLERS: Dict[Type[Exception], Callable[[commands.Context, Any], Awaitable[None]]] = {
+    discord.errors.HTTPException: _handle_http_exception,
+    orjson.JSONDecodeError: _handle_json_decode_error,
+    OverflowError: _handle_overflow_error,
+    commands.BadArgument: _handle_bad_argument_error
+}
+
+
 def setup(bot):
     """Enables the cog for the bot.
 
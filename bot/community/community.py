@@ -27,6 +27,11 @@ class CommunityCog(commands.Cog):
         self.cat_gaming_rooms = bot.get_guild(int(const.SERVER_ID)).get_channel(int(const.CATEGORY_ID_GAMING_ROOMS))
         self.cat_study_rooms = bot.get_guild(int(const.SERVER_ID)).get_channel(int(const.CATEGORY_ID_STUDY_ROOMS))
 
+    # A special method that is called when the cog gets unloaded. The connections to the database are closed only after
+    # all pending changes have been committed.
+    def cog_unload(self):
+        self.bot.loop.create_task(self._db_connector.close_async())
+
     @commands.command(name='studyroom', aliases=["sr"])
     @command_log
     async def create_study_room(self, ctx: commands.Context, ch_name: Optional[str], user_limit: Optional[int]):
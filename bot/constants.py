@@ -51,10 +51,13 @@ LIMIT_WARNINGS_LVL_3 = 6
 
 LIMIT_COMMUNITY_CHANNELS = 20
 LIMIT_SONG_QUEUE = 300
+LIMIT_PASTEBIN_CACHE = 128
+LIMIT_PASTEBIN_SIZE = 512 * 1024
 
 # Timeouts
 TIMEOUT_USER_SELECTION = 15
 TIMEOUT_INFORMATION = 8
+TIMEOUT_PASTEBIN_CACHE = 60 * 60
 
 # Discord Server Boosts
 DISCORD_BOOST_LVL1_CAP = 2
@@ -27,6 +27,11 @@ class FeedbackCog(commands.Cog):
         # Channel instances
         self.ch_suggestion = bot.get_guild(int(const.SERVER_ID)).get_channel(int(const.CHANNEL_ID_SUGGESTIONS))
 
+    # A special method that is called when the cog gets unloaded. The connections to the database are closed only after
+    # all pending changes have been committed.
+    def cog_unload(self):
+        self.bot.loop.create_task(self._db_connector.close_async())
+
     @commands.group(name="suggestion", invoke_without_command=True, aliases=["suggest"])
     @command_log
     async def manage_suggestions(self, ctx: commands.Context, *, suggestion: str):
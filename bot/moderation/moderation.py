@@ -3,7 +3,7 @@
 import operator
 import re
 from datetime import datetime, timedelta
-from typing import List, Optional, Union
+from typing import Callable, Iterable, List, Optional, Tuple, Union
 
 import discord
 from discord.ext import commands
@@ -15,6 +15,10 @@ from bot.persistence import DatabaseConnector
 from bot.utility.time_parsing import get_future_timestamp, get_pretty_string_duration
 
 
+# Reactions which can be used to answer a confirmation dialog.
+_CONFIRMATION_EMOJIS = frozenset((const.EMOJI_CANCEL, const.EMOJI_CONFIRM))
+
+
 class ModerationCog(commands.Cog):
     """Cog for Moderation Functions."""
 
@@ -45,6 +49,11 @@ class ModerationCog(commands.Cog):
         self.role_moderator = bot.get_guild(int(const.SERVER_ID)).get_role(int(const.ROLE_ID_MODERATOR))
         self.role_muted = bot.get_guild(int(const.SERVER_ID)).get_role(int(const.ROLE_ID_MUTED))
 
+    # A special method that is called when the cog gets unloaded. The connections to the database are closed only after
+    # all pending changes have been committed.
+    def cog_unload(self):
+        self.bot.loop.create_task(self._db_connector.close_async())
+
     # A special method that registers as a commands.check() for every command and subcommand in this cog.
     # Only moderators can use the commands defined in this Cog except for `report` and `modmail`.
     def cog_check(self, ctx):
@@ -815,7 +824,7 @@ class ModerationCog(commands.Cog):
             embed.set_image(url=image.url)
 
         msg_modmail = await self.ch_modmail.send(embed=embed, files=files)
-        self._db_connector.add_modmail(msg_modmail.id, msg_author_name, msg_timestamp)
+        await self._db_connector.add_modmail_async(msg_modmail.id, msg_author_name, msg_timestamp)
         log.info("Member %s submitted a modmail.", ctx.author)
 
         await msg_modmail.add_reaction(const.EMOJI_MODMAIL_DONE)
@@ -934,7 +943,7 @@ class ModerationCog(commands.Cog):
             was_warning_added (bool): Specifies if a warning has been added or not to prevent that a user gets punished multiple times.
         """
         warnings = self._db_connector.get_member_warnings(user.id)
-        cntr_warnings = len(warnings) if warnings else 0
+        cntr_warnings = len(warnings)
         punishments = {
             const.LIMIT_WARNINGS_LVL_1:      ("tempmute", "1 week"),
             const.LIMIT_WARNINGS_LVL_2:      ("tempban", "2 weeks"),
@@ -986,15 +995,15 @@ class ModerationCog(commands.Cog):
 
         if reaction_added and emoji == const.EMOJI_MODMAIL_DONE:
             await modmail.clear_reaction(const.EMOJI_MODMAIL_ASSIGN)
-            self._db_connector.change_modmail_status(modmail.id, ModmailStatus.CLOSED)
+            await self._db_connector.change_modmail_status_async(modmail.id, ModmailStatus.CLOSED)
             dict_embed["title"] += "Erledigt"
             dict_embed["color"] = const.EMBED_COLOR_MODMAIL_CLOSED
         elif reaction_added and emoji == const.EMOJI_MODMAIL_ASSIGN:
-            self._db_connector.change_modmail_status(modmail.id, ModmailStatus.ASSIGNED)
+            await self._db_connector.change_modmail_status_async(modmail.id, ModmailStatus.ASSIGNED)
             dict_embed["title"] += "In Bearbeitung"
             dict_embed["color"] = const.EMBED_COLOR_MODMAIL_ASSIGNED
         else:
-            self._db_connector.change_modmail_status(modmail.id, ModmailStatus.OPEN)
+            await self._db_connector.change_modmail_status_async(modmail.id, ModmailStatus.OPEN)
             dict_embed["title"] += "Offen"
             dict_embed["color"] = const.EMBED_COLOR_MODMAIL_OPEN
 
@@ -1022,12 +1031,8 @@ class ModerationCog(commands.Cog):
         await message.add_reaction(const.EMOJI_CONFIRM)
         await message.add_reaction(const.EMOJI_CANCEL)
 
-        def check_reaction(_reaction, user):
-            return user == ctx.author and _reaction.message.id == message.id and \
-                   str(_reaction.emoji) in [const.EMOJI_CANCEL, const.EMOJI_CONFIRM]
-
         reaction = await self.bot.wait_for('reaction_add', timeout=const.TIMEOUT_USER_SELECTION,
-                                           check=check_reaction)
+                                           check=_make_confirmation_check(ctx.author, message))
         await message.delete()
 
         if str(reaction[0].emoji) == const.EMOJI_CANCEL:
@@ -1051,6 +1056,24 @@ class ModerationCog(commands.Cog):
             self._db_connector.add_member_name(before.id, before.display_name, datetime.utcnow())
 
 
+def _make_confirmation_check(author: discord.Member, message: discord.Message) \
+        -> Callable[[discord.Reaction, discord.User], bool]:
+    """Creates the check used for waiting on the answer to a confirmation dialog.
+
+    Args:
+        author (discord.Member): The member who has to answer the dialog.
+        message (discord.Message): The message containing the confirmation dialog.
+
+    Returns:
+        Callable[[discord.Reaction, discord.User], bool]: A check which only accepts confirming or cancelling reactions
+        by the author to the dialog.
+    """
+    def check_reaction(_reaction, user):
+        return user == author and _reaction.message.id == message.id and str(_reaction.emoji) in _CONFIRMATION_EMOJIS
+
+    return check_reaction
+
+
 async def _scheduled_unmute_user(user_id: int):
     """Method which is being called by the scheduler if the specified amount of time for the corresponding tempmute has
     ran out.
@@ -1343,7 +1366,7 @@ def _create_report_embed(offender: discord.Member, reporter: discord.Member, cha
     return embed
 
 
-def _modmail_create_ticket_list(messages: List[tuple]) -> str:
+def _modmail_create_ticket_list(messages: Iterable[tuple]) -> Tuple[str, int]:
     """Method which creates a string representing a list of modmail tickets.
 
     Each entry of the list consists of a timestamp representing the moment this ticket has been submitted and a link to
@@ -1351,31 +1374,32 @@ def _modmail_create_ticket_list(messages: List[tuple]) -> str:
     submitted the ticket.
 
     Args:
-        messages (List[tuple]): A list containing tuples consisting of a message id and the authors name.
+        messages (Iterable[tuple]): Tuples consisting of a message id, the authors name and the timestamp of the
+                                    submission.
 
     Returns:
-        str: A listing of hyperlinks with the specified Discord messages as their targets.
+        Tuple[str, int]: A listing of hyperlinks with the specified Discord messages as their targets and the number of
+                         tickets it contains.
     """
     string = ""
+    count = 0
 
-    time_difference = datetime.utcnow().astimezone().utcoffset()
     for message in messages:
-        timestamp = datetime.strptime(message[2], '%Y-%m-%d %H:%M:%S.%f')
-        local_timestamp = timestamp + time_difference if time_difference else timestamp
-        str_time = local_timestamp.strftime('%d.%m.%Y %H:%M')
+        str_time = message[2].astimezone().strftime('%d.%m.%Y %H:%M')
 
         string += "- {0} | [{1[1]}]({2}/channels/{3}/{4}/{1[0]})\n" \
             .format(str_time, message, const.URL_DISCORD, const.SERVER_ID, const.CHANNEL_ID_MODMAIL)
+        count += 1
 
-    return string
+    return string, count
 
 
-def _modmail_create_list_embed(status: ModmailStatus, modmail: List[tuple]) -> discord.Embed:
+def _modmail_create_list_embed(status: ModmailStatus, modmail: Iterable[tuple]) -> discord.Embed:
     """Method which creates an Embed containing a list of hyperlinks to all the modmail with the specified status.
 
     Args:
         status (ModmailStatus): The status specified by a moderator.
-        modmail (List[tuple]): A list containing tuples consisting of a message id and the authors name.
+        modmail (Iterable[tuple]): Tuples consisting of a message id and the authors name.
 
     Returns:
         discord.Embed: The embed containing the list of hyperlinks with the authors name as the link text.
@@ -1383,16 +1407,16 @@ def _modmail_create_list_embed(status: ModmailStatus, modmail: List[tuple]) -> d
     embed = discord.Embed(timestamp=datetime.utcnow())
     embed.set_footer(text="Erstellt am")
     dict_embed = embed.to_dict()
+    ticket_list, ticket_count = _modmail_create_ticket_list(modmail)
 
-    if modmail is not None:
-        dict_embed = embed.to_dict()
-        dict_embed["description"] = _modmail_create_ticket_list(modmail)
+    if ticket_count:
+        dict_embed["description"] = ticket_list
 
         if status == ModmailStatus.OPEN:
-            dict_embed["title"] = "Offenen Tickets: " + str(len(modmail))
+            dict_embed["title"] = "Offenen Tickets: " + str(ticket_count)
             dict_embed["color"] = const.EMBED_COLOR_MODMAIL_OPEN
         elif status == ModmailStatus.ASSIGNED:
-            dict_embed["title"] = "Zugewiesene Tickets: " + str(len(modmail))
+            dict_embed["title"] = "Zugewiesene Tickets: " + str(ticket_count)
             dict_embed["color"] = const.EMBED_COLOR_MODMAIL_ASSIGNED
         else:
             raise ValueError("Nicht unterstützter Modmail-Status '{0}'.".format(status.name.title()))
@@ -0,0 +1,109 @@
+"""Contains logic for committing write statements issued on the event loop in batches."""
+
+import asyncio
+import sqlite3
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+
+# Time in seconds the batch writer waits for further statements before committing a batch and the maximum number of
+# statements committed at once.
+_BATCH_DELAY = 0.01
+_BATCH_SIZE = 64
+
+# A statement consists of the SQL, the values for its placeholders and an optional callback, which is invoked right
+# after the transaction containing the statement has been committed, e.g. for invalidating cached values.
+Statement = Tuple[str, Sequence, Optional[Callable[[], None]]]
+
+
+class BatchWriter:
+    """Collects write statements issued on the event loop and commits them together in a single transaction.
+
+    Statements arriving within a short time of each other are written by a background task, so a burst of changes only
+    has to wait for a single commit. The background task has to be created on the running event loop and writes all
+    statements left in the queue before it exits, even if it gets cancelled because the loop is shutting down.
+    """
+
+    def __init__(self, write_batch: Callable[[Sequence[Statement]], List[Any]]):
+        """Creates the writer and starts its background task on the running event loop.
+
+        Args:
+            write_batch (Callable[[Sequence[Statement]], List[Any]]): The blocking function which writes a batch of
+                statements within a single transaction, invokes their callbacks after the commit and returns the
+                result or error of each statement.
+        """
+        self._write_batch = write_batch
+        self._queue: 'asyncio.Queue[Tuple[Statement, asyncio.Future]]' = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._process())
+
+    @property
+    def active(self) -> bool:
+        """bool: Whether the background task of the writer is still running."""
+        return not self._task.done()
+
+    async def write(self, statement: Statement) -> Optional[sqlite3.Row]:
+        """Queues a statement and waits until the batch containing it has been committed.
+
+        Args:
+            statement (Statement): The statement to be executed.
+
+        Returns:
+            Optional[sqlite3.Row]: The first row returned by the statement, if any.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((statement, future))
+        return await future
+
+    async def flush(self):
+        """Waits until all queued statements have been committed."""
+        await self._queue.join()
+
+    async def close(self):
+        """Waits until all queued statements have been committed and stops the background task afterwards."""
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    async def _process(self):
+        """Background task which takes statements from the queue and writes them in batches."""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[Statement, asyncio.Future]] = []
+
+        try:
+            while True:
+                batch.append(await self._queue.get())
+
+                deadline = loop.time() + _BATCH_DELAY
+                while len(batch) < _BATCH_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                writing, batch = batch, []
+                try:
+                    results = await loop.run_in_executor(None, self._write_batch,
+                                                         [statement for statement, _ in writing])
+                except sqlite3.Error as error:
+                    results = [error] * len(writing)
+
+                for (_, future), result in zip(writing, results):
+                    if not future.done():
+                        if isinstance(result, Exception):
+                            future.set_exception(result)
+                        else:
+                            future.set_result(result)
+                    self._queue.task_done()
+        except asyncio.CancelledError:
+            # The event loop is about to stop, which is why the remaining statements are written right away.
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            if batch:
+                self._write_batch([statement for statement, _ in batch])
+            raise
@@ -1,20 +1,54 @@
 """Contains logic for connecting to and manipulating the database."""
 
 import datetime
+import functools
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
 from sqlite3 import Error
-from typing import List, Optional, Iterator, Iterable
+from typing import Callable, List, Optional, Iterator, Iterable, Sequence, Union
 
 from bot.moderation import ModmailStatus
 from bot.feedback import SuggestionStatus
 from bot.persistence import queries
-from .database_manager import DatabaseManager
+from .batch_writer import BatchWriter, Statement
+from .lookup_cache import LookupCache
+
+
+# Settings applied to every connection. WAL allows reading while another connection writes and, together with
+# synchronous=NORMAL, avoids most of the fsyncs needed for every commit in the default rollback journal mode.
+_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-64000;
+PRAGMA busy_timeout=5000;
+"""
+
+# Number of prepared statements kept by each connection.
+_STATEMENT_CACHE_SIZE = 256
+
+# Number of rows fetched at once when the rows of a query are streamed.
+_FETCH_SIZE = 64
+
+# Lookup table for converting stored status ids, which is a lot cheaper than calling the enum itself.
+_STATUS_BY_VALUE = {status.value: status for status in ModmailStatus}
+
+# Maximum number of entries kept by each of the lookup caches. Every cog uses its own connector, which is why the
+# caches are shared by all connectors and keyed by the database file as well.
+_CACHE_SIZE = 256
+_MODMAIL_STATUS_CACHE = LookupCache(_CACHE_SIZE)
+_BOTONLY_CACHE = LookupCache(_CACHE_SIZE)
 
 
 class DatabaseConnector:
     """Class used to communicate with the database.
 
     The database is created and initialized using the __init__ method. The other methods support getting or adding
-    properties to the database.
+    properties to the database. All changes are made through a single writer connection, while every thread reads via
+    its own connection, so reads don't have to wait for each other. The connections are kept open for the whole
+    lifetime of the connector, which should be closed via the close method once it isn't needed anymore.
     """
 
     def __init__(self, db_file: str, init_script: Optional[str]):
@@ -29,14 +63,208 @@ class DatabaseConnector:
             raise Error("Database filepath and/or filename hasn't been set.")
 
         self._db_file = db_file
-        with DatabaseManager(self._db_file) as db_manager:
-            if init_script:
-                queries_ = self.parse_sql_file(init_script)
-                for query in queries_:
+
+        # The writer connection is shared by all threads, which is why every access needs the lock. Thanks to WAL,
+        # the reader connections always see the last committed state without having to wait for the writer.
+        self._connection = _connect(self._db_file)
+        self._lock = threading.Lock()
+        self._reader_local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._batch_writer: Optional[BatchWriter] = None
+
+        if init_script:
+            with open(init_script, 'r', encoding='utf-8') as file:
+                sql_script = file.read()
+
+            try:
+                self._connection.executescript(sql_script)
+            except Error as error:
+                print("Init script could not be executed completely: {0}".format(error))
+
+    async def close_async(self):
+        """Commits all pending changes made via the asynchronous methods and closes all connections afterwards.
+
+        This is the method which should be used for closing a connector whose asynchronous methods have been used.
+        """
+        if self._batch_writer is not None and self._batch_writer.active:
+            await self._batch_writer.close()
+        self.close()
+
+    def close(self):
+        """Closes all connections to the database."""
+        with self._lock:
+            self._connection.close()
+        with self._readers_lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers.clear()
+        _MODMAIL_STATUS_CACHE.clear(self._db_file)
+        _BOTONLY_CACHE.clear(self._db_file)
+
+    def _reader(self) -> sqlite3.Connection:
+        """Returns the reader connection of the current thread and opens it first if necessary.
+
+        Returns:
+            sqlite3.Connection: The connection used by the current thread for read-only queries.
+        """
+        try:
+            return self._reader_local.connection
+        except AttributeError:
+            reader = _connect(self._db_file)
+            with self._readers_lock:
+                self._readers.append(reader)
+            self._reader_local.connection = reader
+            return reader
+
+    def _execute(self, sql: str, parameters: Sequence = ()) -> sqlite3.Cursor:
+        """Executes a single SQL statement. Any changes will be committed immediately.
+
+        Args:
+            sql (str): The SQL statement to be executed.
+            parameters (Sequence): The values for the placeholders of the statement.
+
+        Returns:
+            sqlite3.Cursor: The cursor containing the result of the statement.
+        """
+        with self._lock:
+            return self._connection.execute(sql, parameters)
+
+    def _fetchone(self, sql: str, parameters: Sequence = ()) -> Optional[sqlite3.Row]:
+        """Executes a single SQL query and returns the first row of its result.
+
+        Args:
+            sql (str): The SQL query to be executed.
+            parameters (Sequence): The values for the placeholders of the query.
+
+        Returns:
+            Optional[sqlite3.Row]: The first row of the result or None if the result is empty.
+        """
+        cursor = self._reader().execute(sql, parameters)
+        try:
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+
+    def _fetchall(self, sql: str, parameters: Sequence = ()) -> List[sqlite3.Row]:
+        """Executes a single SQL query and returns all rows of its result.
+
+        Args:
+            sql (str): The SQL query to be executed.
+            parameters (Sequence): The values for the placeholders of the query.
+
+        Returns:
+            List[sqlite3.Row]: A list containing all rows of the result.
+        """
+        cursor = self._reader().execute(sql, parameters)
+        try:
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _iterate(self, sql: str, parameters: Sequence = ()) -> Iterator[sqlite3.Row]:
+        """Executes a single SQL query and lazily yields the rows of its result.
+
+        The rows are fetched in small batches while the result is being iterated, which is why the query is only
+        executed once the iteration starts. Until the iteration has finished, the statement holds a read snapshot on
+        the reader connection of the current thread, so later reads on that thread won't see newer commits and WAL
+        checkpoints are blocked. It must therefore only be used for results which are consumed synchronously, without
+        awaiting anything in between.
+
+        Args:
+            sql (str): The SQL query to be executed.
+            parameters (Sequence): The values for the placeholders of the query.
+
+        Yields:
+            sqlite3.Row: The next row of the result.
+        """
+        cursor = self._reader().execute(sql, parameters)
+        try:
+            while True:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    async def _write(self, sql: str, parameters: Sequence = (),
+                     after_commit: Optional[Callable[[], None]] = None) -> Optional[sqlite3.Row]:
+        """Executes a single SQL statement as part of the next batch written by the batch writer.
+
+        The batch writer is created on the first call, because it needs to be bound to the running event loop.
+
+        Args:
+            sql (str): The SQL statement to be executed.
+            parameters (Sequence): The values for the placeholders of the statement.
+            after_commit (Optional[Callable[[], None]]): Callback invoked right after the batch has been committed and
+                                                         before any waiting coroutine is resumed.
+
+        Returns:
+            Optional[sqlite3.Row]: The first row returned by the statement, if any.
+        """
+        if self._batch_writer is None or not self._batch_writer.active:
+            self._batch_writer = BatchWriter(self._write_batch)
+        return await self._batch_writer.write((sql, parameters, after_commit))
+
+    def _write_batch(self, statements: Sequence[Statement]) -> List[Union[Optional[sqlite3.Row], Error]]:
+        """Executes several SQL statements within a single transaction.
+
+        Every statement is run within its own savepoint, so a failing statement doesn't affect the other ones. The
+        callbacks of the statements are invoked once the transaction has been committed.
+
+        Args:
+            statements (Sequence[Statement]): The statements, the values for their placeholders and their callbacks.
+
+        Returns:
+            List[Union[Optional[sqlite3.Row], Error]]: The first row returned by each statement or the error it raised.
+        """
+        results: List[Union[Optional[sqlite3.Row], Error]] = []
+
+        with self._transaction() as connection:
+            for sql, parameters, _ in statements:
+                connection.execute("SAVEPOINT batch_statement")
+                try:
+                    cursor = connection.execute(sql, parameters)
                     try:
-                        db_manager.execute(query)
-                    except Error as error:
-                        print("Command could not be executed, skipping it: {0}".format(error))
+                        results.append(cursor.fetchone())
+                    finally:
+                        cursor.close()
+                except Error as error:
+                    connection.execute("ROLLBACK TO batch_statement")
+                    results.append(error)
+                connection.execute("RELEASE batch_statement")
+
+        for _, _, after_commit in statements:
+            if after_commit is not None:
+                after_commit()
+
+        return results
+
+    async def flush(self):
+        """Waits until all changes made via the asynchronous methods of the connector have been committed."""
+        if self._batch_writer is not None and self._batch_writer.active:
+            await self._batch_writer.flush()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Context manager for executing multiple SQL statements within a single transaction.
+
+        The transaction will be committed if the indented block has been executed successfully and rolled back if any
+        exception has been raised. It is started as an immediate transaction, so the write lock of the database is
+        acquired right away instead of possibly failing with a busy error in the middle of the block.
+
+        Yields:
+            sqlite3.Connection: The connection on which the statements should be executed.
+        """
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._connection
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
 
     def add_member_warning(self, user_id: int, timestamp: datetime.datetime, reason: Optional[str]):
         """Adds a warning to the table "MemberWarning".
@@ -46,9 +274,7 @@ class DatabaseConnector:
             timestamp (datetime.datetime): Timestamp representing the moment when the member was warned.
             reason (Optional[str]): The reason provided by the moderator why the member was warned.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_MEMBER_WARNING, (user_id, timestamp, reason))
-            db_manager.commit()
+        self._execute(queries.INSERT_MEMBER_WARNING, (user_id, timestamp, reason))
 
     def remove_member_warning(self, warning_id: int):
         """Removes the warning with the specified id from the table "MemberWarning".
@@ -56,9 +282,7 @@ class DatabaseConnector:
         Args:
             warning_id (int): The id of the warning which should be removed.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.DELETE_MEMBER_WARNING, (warning_id,))
-            db_manager.commit()
+        self._execute(queries.DELETE_MEMBER_WARNING, (warning_id,))
 
     def remove_member_warnings(self, user_id: int):
         """Removes all warnings of a member from the table "MemberWarning".
@@ -66,9 +290,7 @@ class DatabaseConnector:
         Args:
             user_id (int): The id of the member whose warnings should be removed.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.DELETE_MEMBER_WARNINGS, (user_id,))
-            db_manager.commit()
+        self._execute(queries.DELETE_MEMBER_WARNINGS, (user_id,))
 
     def get_warning_userid(self, warning_id: int) -> Optional[int]:
         """Gets the id of the member which received the warning with the specified id.
@@ -79,31 +301,22 @@ class DatabaseConnector:
         Returns:
             Optional[int]: The id of the member who has been warned.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_WARNING_USERID, (warning_id,))
-
-            row = result.fetchone()
-            if row:
-                return int(row[0])
-            return None
+        row = self._fetchone(queries.GET_WARNING_USERID, (warning_id,))
+        if row:
+            return int(row[0])
+        return None
 
-    def get_member_warnings(self, user_id: int) -> Optional[List[tuple]]:
+    def get_member_warnings(self, user_id: int) -> List[sqlite3.Row]:
         """Gets all the warnings of a specific member.
 
         Args:
             user_id (int): The id of the member whose warnings have been requested.
 
         Returns:
-            Optional[List[tuple]]: A list containing the id of the warning, the timestamp when it happened and the
-                                   reason provided by the moderator.
+            List[sqlite3.Row]: A list containing the id of the warning, the timestamp when it happened and the
+                         reason provided by the moderator.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_MEMBER_WARNINGS, (user_id,))
-
-            rows = result.fetchall()
-            if rows:
-                return rows
-            return None
+        return self._fetchall(queries.GET_MEMBER_WARNINGS, (user_id,))
 
     def add_member_name(self, user_id: int, name: str, timestamp: datetime.datetime):
         """Adds a members old nickname to the table "MemberNameHistory".
@@ -113,27 +326,19 @@ class DatabaseConnector:
             name (str): The old nickname used before the change.
             timestamp (datetime.datetime): A timestamp representing when the nickname has been changed.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_MEMBER_NAME, (user_id, name, timestamp))
-            db_manager.commit()
+        self._execute(queries.INSERT_MEMBER_NAME, (user_id, name, timestamp))
 
-    def get_member_names(self, user_id: int) -> Optional[List[tuple]]:
+    def get_member_names(self, user_id: int) -> List[sqlite3.Row]:
         """Gets all the nicknames used by a member from the table "MemberNameHistory".
 
         Args:
             user_id (int): The id of the member whose nicknames have been requested.
 
         Returns:
-            Optional[List[tuple]]: A list containing tuples consisting of the nickname and the timestamp representing
-                                   when the name has been replaced.
+            List[sqlite3.Row]: A list containing tuples consisting of the nickname and the timestamp representing
+                         when the name has been replaced.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_MEMBER_NAMES, (user_id,))
-
-            rows = result.fetchall()
-            if rows:
-                return rows
-            return None
+        return self._fetchall(queries.GET_MEMBER_NAMES, (user_id,))
 
     def add_module_role(self, role_id: int):
         """Adds a role to the table "ModuleRole".
@@ -141,9 +346,7 @@ class DatabaseConnector:
         Args:
             role_id (int): The id of the role which should be added.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_MODULE_ROLE, (role_id,))
-            db_manager.commit()
+        self._execute(queries.INSERT_MODULE_ROLE, (role_id,))
 
     def remove_module_role(self, role_id: int):
         """Removes a role from the table "ModuleRole".
@@ -151,9 +354,7 @@ class DatabaseConnector:
         Args:
             role_id (int): The role id of the role which should be removed.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.REMOVE_MODULE_ROLE, (role_id,))
-            db_manager.commit()
+        self._execute(queries.REMOVE_MODULE_ROLE, (role_id,))
 
     def check_module_role(self, role_id: int) -> bool:
         """Check if there's an entry for the specified role in the table "ModuleRole".
@@ -164,11 +365,9 @@ class DatabaseConnector:
         Returns:
             bool: A boolean indicating if the role has been whitelisted.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.CHECK_IF_MODULE_ROLE, (role_id,))
-            row = result.fetchone()
+        row = self._fetchone(queries.CHECK_IF_MODULE_ROLE, (role_id,))
 
-            return bool(row[0])
+        return row is not None and bool(row["IsModuleRole"])
 
     def get_reaction_role(self, msg_id: int, emoji: str) -> Optional[int]:
         """Gets the role id for the specified reaction on a specific message.
@@ -180,13 +379,10 @@ class DatabaseConnector:
         Returns:
             Optional[int]: The id of the role associated with the given message + reaction.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_REACTION_ROLE, (msg_id, emoji))
-
-            row = result.fetchone()
-            if row:
-                return int(row[0])
-            return None
+        row = self._fetchone(queries.GET_REACTION_ROLE, (msg_id, emoji))
+        if row:
+            return int(row[0])
+        return None
 
     def add_reaction_role(self, msg_id: int, emoji: str, role_id: int):
         """Adds information needed for a reaction role to the table "ReactionRole".
@@ -196,9 +392,7 @@ class DatabaseConnector:
             emoji (str): The emoji for the reaction role.
             role_id (int): The id of the role for the reaction role.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_REACTION_ROLE, (msg_id, emoji, role_id))
-            db_manager.commit()
+        self._execute(queries.INSERT_REACTION_ROLE, (msg_id, emoji, role_id))
 
     def remove_reaction_role(self, msg_id: int, emoji: str):
         """Removes information needed for a reaction role from the table "ReactionRole".
@@ -207,9 +401,7 @@ class DatabaseConnector:
             msg_id (int): The id of the message which users should react to.
             emoji (str): The emoji for the specific reaction role.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.REMOVE_REACTION_ROLE, (msg_id, emoji))
-            db_manager.commit()
+        self._execute(queries.REMOVE_REACTION_ROLE, (msg_id, emoji))
 
     def clear_reaction_roles(self, msg_id: int) -> bool:
         """Removes all information needed for the reaction roles of a specific message from the table "ReactionRole".
@@ -220,11 +412,9 @@ class DatabaseConnector:
         Returns:
             bool: A boolean indicating if any reaction roles have been deleted.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            affected_rows = db_manager.execute(queries.CLEAR_REACTION_ROLES, (msg_id,)).rowcount
-            db_manager.commit()
+        affected_rows = self._execute(queries.CLEAR_REACTION_ROLES, (msg_id,)).rowcount
 
-            return affected_rows != 0
+        return affected_rows != 0
 
     def add_reaction_role_uniqueness_group(self, msg_id: int):
         """Adds the id of a message to the table "ReactionRoleGroup".
@@ -235,9 +425,7 @@ class DatabaseConnector:
         Args:
             msg_id (int): The id of the message which users can react to.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_REACTION_ROLE_UNIQUENESS_GROUP, (msg_id,))
-            db_manager.commit()
+        self._execute(queries.INSERT_REACTION_ROLE_UNIQUENESS_GROUP, (msg_id,))
 
     def remove_reaction_role_uniqueness_group(self, msg_id: int):
         """Removes the id of a message from the table "ReactionRoleGroup".
@@ -248,9 +436,7 @@ class DatabaseConnector:
         Args:
             msg_id (int): The id of the message which users can react to.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.REMOVE_REACTION_ROLE_UNIQUENESS_GROUP, (msg_id,))
-            db_manager.commit()
+        self._execute(queries.REMOVE_REACTION_ROLE_UNIQUENESS_GROUP, (msg_id,))
 
     def is_reaction_role_uniqueness_group(self, msg_id: int) -> bool:
         """Checks if the reaction roles of a message have been declared as unique.
@@ -263,11 +449,9 @@ class DatabaseConnector:
         Returns:
             bool: A boolean indicating if the reaction roles of a message have been declared as unique.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.IS_REACTION_ROLE_UNIQUE, (msg_id,))
-            row = result.fetchone()
+        row = self._fetchone(queries.IS_REACTION_ROLE_UNIQUE, (msg_id,))
 
-            return bool(row[0])
+        return row is not None and bool(row["IsUnique"])
 
     def add_suggestion(self, author_id: int, timestamp: datetime.datetime) -> int:
         """Adds a suggestion to the table "Suggestion".
@@ -279,11 +463,10 @@ class DatabaseConnector:
         Returns:
             int: The row id of the new entry.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            row_id = db_manager.execute(queries.INSERT_SUGGESTION, (author_id, timestamp)).lastrowid
-            db_manager.commit()
+        row_id = self._execute(queries.INSERT_SUGGESTION, (author_id, timestamp)).lastrowid
+        assert row_id is not None  # Always set after a successful insert.
 
-            return row_id
+        return row_id
 
     def set_suggestion_message_id(self, suggestion_id: int, message_id: int):
         """Sets the message id of a specific suggestion.
@@ -292,26 +475,21 @@ class DatabaseConnector:
             suggestion_id (int): The id of the suggestion.
             message_id (int): The message id of the embed posted in the suggestion channel.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.SET_SUGGESTION_MESSAGE_ID, (message_id, suggestion_id))
-            db_manager.commit()
+        self._execute(queries.SET_SUGGESTION_MESSAGE_ID, (message_id, suggestion_id))
 
-    def get_suggestion(self, suggestion_id: int) -> Optional[tuple]:
+    def get_suggestion(self, suggestion_id: int) -> Optional[sqlite3.Row]:
         """Gets data regarding a suggestion with the specified id.
 
         Args:
             suggestion_id (int): The id of the suggestion.
 
         Returns:
-            tuple: A tuple containing MessageID, StatusID and AuthorID of a suggestion in the table "Suggestion".
+            sqlite3.Row: A row containing MessageID, StatusID and AuthorID of a suggestion in the table "Suggestion".
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_SUGGESTION_BY_ID, (suggestion_id,))
-
-            row = result.fetchone()
-            if row:
-                return row
-            return None
+        row = self._fetchone(queries.GET_SUGGESTION_BY_ID, (suggestion_id,))
+        if row:
+            return row
+        return None
 
     def get_suggestion_status(self, message_id: int) -> Optional[SuggestionStatus]:
         """Gets the status of a suggestion with the specified message id.
@@ -322,13 +500,10 @@ class DatabaseConnector:
         Returns:
             SuggestionStatus: The status of the suggestion.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_SUGGESTION_STATUS, (message_id,))
-
-            row = result.fetchone()
-            if row:
-                return SuggestionStatus(row[0])
-            return None
+        row = self._fetchone(queries.GET_SUGGESTION_STATUS, (message_id,))
+        if row:
+            return SuggestionStatus(row[0])
+        return None
 
     def set_suggestion_status(self, suggestion_id: int, status: SuggestionStatus) -> bool:
         """Sets the status of a suggestion with the specified id.
@@ -340,30 +515,21 @@ class DatabaseConnector:
         Returns:
             bool: A boolean representing if any rows have been changed
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            affected_rows = db_manager.execute(queries.SET_SUGGESTION_STATUS, (status.value, suggestion_id)) \
-                .rowcount
-            db_manager.commit()
-            return affected_rows != 0
+        affected_rows = self._execute(queries.SET_SUGGESTION_STATUS, (status.value, suggestion_id)).rowcount
+        return affected_rows != 0
 
-    def get_all_suggestions_with_status(self, status: SuggestionStatus) -> Optional[List[tuple]]:
+    def get_all_suggestions_with_status(self, status: SuggestionStatus) -> List[sqlite3.Row]:
         """Gets data about all suggestions with the specified status.
 
         Args:
             status (SuggestionStatus): The status which the suggestions should have.
 
         Returns:
-            Optional[List[tuple]]: A list containing data of all suggestions with the specified status.
+            List[sqlite3.Row]: A list containing data of all suggestions with the specified status.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_ALL_SUGGESTIONS_WITH_STATUS, (status.value,))
-
-            rows = result.fetchall()
-            if rows:
-                return rows
-            return None
+        return self._fetchall(queries.GET_ALL_SUGGESTIONS_WITH_STATUS, (status.value,))
 
-    def add_modmail(self, msg_id: int, author: str, timestamp: datetime.datetime):
+    def add_modmail(self, msg_id: int, author: str, timestamp: datetime.datetime) -> ModmailStatus:
         """Inserts the username of the author and the message id of a submitted modmail into the database and
         sets its status to `Open`.
 
@@ -371,10 +537,45 @@ class DatabaseConnector:
             msg_id (int): The message id of the modmail which has been submitted.
             author (str): The username with the discriminator of the author.
             timestamp (datetime.datetime): A timestamp representing the moment when the message has been submitted.
+                                           Naive timestamps are treated as UTC, just like the ones used by discord.py.
+
+        Returns:
+            ModmailStatus: The status with which the modmail has been stored.
+        """
+        with self._lock:
+            cursor = self._connection.execute(queries.INSERT_MODMAIL, (msg_id, author, _encode_timestamp(timestamp)))
+            try:
+                row = cursor.fetchone()
+            finally:
+                # The insert is only committed once the statement has been reset.
+                cursor.close()
+
+        if row is None:
+            raise Error("The status of the inserted modmail hasn't been returned.")
+
+        status = _STATUS_BY_VALUE[row["StatusID"]]
+        _MODMAIL_STATUS_CACHE.replace(self._db_file, msg_id, status)
+        return status
+
+    async def add_modmail_async(self, msg_id: int, author: str, timestamp: datetime.datetime) -> ModmailStatus:
+        """Same as `add_modmail`, but the modmail is written by the batch writer without blocking the event loop.
+
+        Args:
+            msg_id (int): The message id of the modmail which has been submitted.
+            author (str): The username with the discriminator of the author.
+            timestamp (datetime.datetime): A timestamp representing the moment when the message has been submitted.
+
+        Returns:
+            ModmailStatus: The status with which the modmail has been stored.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_MODMAIL, (msg_id, author, timestamp))
-            db_manager.commit()
+        row = await self._write(queries.INSERT_MODMAIL, (msg_id, author, _encode_timestamp(timestamp)))
+
+        if row is None:
+            raise Error("The status of the inserted modmail hasn't been returned.")
+
+        status = _STATUS_BY_VALUE[row["StatusID"]]
+        _MODMAIL_STATUS_CACHE.replace(self._db_file, msg_id, status)
+        return status
 
     def get_modmail_status(self, msg_id: int) -> Optional[ModmailStatus]:
         """Returns the current status of a modmail associated with the message id given.
@@ -385,13 +586,16 @@ class DatabaseConnector:
         Returns:
             Optional[ModmailStatus]: The current status of the modmail.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_MODMAIL_STATUS, (msg_id,))
+        found, status, generation = _MODMAIL_STATUS_CACHE.get(self._db_file, msg_id)
+        if found:
+            return status
 
-            row = result.fetchone()
-            if row:
-                return ModmailStatus(row[0])
-            return None
+        row = self._fetchone(queries.GET_MODMAIL_STATUS, (msg_id,))
+        if row:
+            status = _STATUS_BY_VALUE[row["StatusID"]]
+            _MODMAIL_STATUS_CACHE.put(self._db_file, msg_id, status, generation)
+            return status
+        return None
 
     def change_modmail_status(self, msg_id: int, status: ModmailStatus):
         """Changes the status of a specific modmail with the given id.
@@ -400,42 +604,68 @@ class DatabaseConnector:
             msg_id (int): The message id of the modmail.
             status (ModmailStatus): The new status which should be set.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.CHANGE_MODMAIL_STATUS, (status.value, msg_id))
-            db_manager.commit()
+        self._execute(queries.CHANGE_MODMAIL_STATUS, (status.value, msg_id))
+        _MODMAIL_STATUS_CACHE.invalidate(self._db_file, msg_id)
+
+    async def change_modmail_status_async(self, msg_id: int, status: ModmailStatus):
+        """Same as `change_modmail_status`, but the change is written by the batch writer without blocking the event
+        loop.
+
+        Args:
+            msg_id (int): The message id of the modmail.
+            status (ModmailStatus): The new status which should be set.
+        """
+        await self._write(queries.CHANGE_MODMAIL_STATUS, (status.value, msg_id),
+                          functools.partial(_MODMAIL_STATUS_CACHE.invalidate, self._db_file, msg_id))
 
-    def get_all_modmail_with_status(self, status: ModmailStatus) -> Optional[List[tuple]]:
+    def get_all_modmail_with_status(self, status: ModmailStatus) -> Iterator[tuple]:
         """Returns the message id of every modmail with the specified status.
 
         Args:
             status (ModmailStatus): The status to look out for.
 
         Returns:
-            Optional[List[tuple]]: A list of all modmails with the the status specified.
+            Iterator[tuple]: An iterator over all modmails with the the status specified. Each modmail consists of its
+                             message id, the name of its author and the aware UTC timestamp of its submission. The
+                             iterator must be consumed synchronously, see `_iterate`.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_ALL_MODMAIL_WITH_STATUS, (status.value,))
-
-            rows = result.fetchall()
-            if rows:
-                return rows
-            return None
+        return ((row[0], row[1], _decode_timestamp(row[2]))
+                for row in self._iterate(queries.GET_ALL_MODMAIL_WITH_STATUS, (status.value,)))
 
     def add_group_offer_and_requests(self, user_id: int, course: str, offered_group: int,
                                      requested_groups: Iterator[int]):
         """Adds new offer and requests for a course and a group.
 
+        Deprecated:
+            Use `add_group_offer_and_requests_with_message` instead, which also stores the id of the message within the
+            same transaction, so no additional call to `update_group_exchange_message_id` is needed.
+
         Args:
             user_id (int): The id of the offering user.
             course (str): The course for which the offer is.
             offered_group (str): The group that the user offers.
             requested_groups (List[str]): List of all groups the user would accept.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.INSERT_GROUP_OFFER, (user_id, course, offered_group))
-            for group_nr in requested_groups:
-                db_manager.execute(queries.INSERT_GROUP_REQUEST, (user_id, course, group_nr))
-            db_manager.commit()
+        with self._transaction() as connection:
+            connection.execute(queries.INSERT_GROUP_OFFER, (user_id, course, offered_group))
+            connection.executemany(queries.INSERT_GROUP_REQUEST,
+                                   [(user_id, course, group_nr) for group_nr in requested_groups])
+
+    def add_group_offer_and_requests_with_message(self, user_id: int, course: str, offered_group: int,
+                                                  requested_groups: Iterable[int], message_id: int):
+        """Adds new offer and requests for a course and a group together with the message containing the offer.
+
+        Args:
+            user_id (int): The id of the offering user.
+            course (str): The course for which the offer is.
+            offered_group (int): The group that the user offers.
+            requested_groups (Iterable[int]): All groups the user would accept.
+            message_id (int): The id of the message that contains the group exchange embed.
+        """
+        with self._transaction() as connection:
+            connection.execute(queries.INSERT_GROUP_OFFER_WITH_MESSAGE, (user_id, course, offered_group, message_id))
+            connection.executemany(queries.INSERT_GROUP_REQUEST,
+                                   [(user_id, course, group_nr) for group_nr in requested_groups])
 
     def update_group_exchange_message_id(self, user_id: int, course: str, message_id: int):
         """Updates the message id in the GroupOffer table from 'undefined' to a valid value
@@ -443,17 +673,18 @@ class DatabaseConnector:
         This function is necessary because the message_id can only be retrieved after the embed is sent, which happens
         after inserting in the db, to ensure constraints are fulfilled.
 
+        Deprecated:
+            Send the embed first and use `add_group_offer_and_requests_with_message` instead.
+
         Args:
             user_id (int): The id of the requesting user.
             course (str): The course that should be exchanged.
             message_id (int): The id of the message that contains the group exchange embed.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.UPDATE_GROUP_MESSAGE_ID, (message_id, user_id, course))
-            db_manager.commit()
+        self._execute(queries.UPDATE_GROUP_MESSAGE_ID, (message_id, user_id, course))
 
     def get_candidates_for_group_exchange(self, user_id: int, course: str, offered_group: int,
-                                          requested_groups: Iterable[int]) -> Optional[List[tuple]]:
+                                          requested_groups: Iterable[int]) -> List[sqlite3.Row]:
         """Gets all possible candidates for a group exchange offer.
 
         Args:
@@ -463,18 +694,11 @@ class DatabaseConnector:
             requested_groups (Iterable[int]): The groups that the user requests.
 
         Returns:
-            Optional[List[tuple]]: A list containing user id and mesage id of potential group exchange candidates.
-        """
-        with DatabaseManager(self._db_file) as db_manager:
-            parameter_list = [user_id, course, offered_group] + list(requested_groups)
-            result = db_manager.execute(
-                queries.FIND_GROUP_EXCHANGE_CANDIDATES.format(', '.join('?' for _ in requested_groups)),
-                tuple(parameter_list)
-            )
-            rows = result.fetchall()
-            if rows:
-                return rows
-            return None
+            List[sqlite3.Row]: A list containing user id and mesage id of potential group exchange candidates.
+        """
+        # The requested groups are bound as a single JSON array so that the statement stays the same for every call.
+        return self._fetchall(queries.FIND_GROUP_EXCHANGE_CANDIDATES,
+                                (user_id, course, offered_group, json.dumps(list(requested_groups))))
 
     def get_group_exchange_message(self, user_id: int, course: int) -> Optional[int]:
         """Gets message id for the request of a user for a specific course.
@@ -486,13 +710,10 @@ class DatabaseConnector:
         Returns:
             Optional[int]: The id of the message containing the request.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_GROUP_EXCHANGE_MESSAGE, (user_id, course))
-
-            rows = result.fetchone()
-            if rows:
-                return int(rows[0])
-            return None
+        rows = self._fetchone(queries.GET_GROUP_EXCHANGE_MESSAGE, (user_id, course))
+        if rows:
+            return int(rows[0])
+        return None
 
     def remove_group_exchange_offer(self, user_id: int, course: str):
         """Removes all entries of a group exchange offer and request for a user.
@@ -501,27 +722,22 @@ class DatabaseConnector:
             user_id (int): The user of which the request and offers should be deleted.
             course (str): The id of the course channel for which the entries should be deleted.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.REMOVE_GROUP_EXCHANGE_OFFER, (user_id, course))
-            db_manager.execute(queries.REMOVE_GROUP_EXCHANGE_REQUESTS, (user_id, course))
-            db_manager.commit()
+        # The requests belonging to the offer are deleted by the trigger DeleteGroupRequestsOfOffer.
+        self._execute(queries.REMOVE_GROUP_EXCHANGE_OFFER, (user_id, course))
 
-    def get_group_exchange_for_user(self, user_id: int) -> Optional[List[tuple]]:
+    def get_group_exchange_for_user(self, user_id: int) -> List[sqlite3.Row]:
         """Executes a query to get all group exchange requests for a user.
 
+        The rows are fetched at once instead of being streamed, because the caller awaits Discord requests for every
+        single one of them.
+
         Args:
             user_id (int): The id of the user which requests should be fetched.
 
         Returns:
-            Optional[List[tuple]]: A list containing all the group requests a user currently has.
+            List[sqlite3.Row]: A list containing all the group requests a user currently has.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.GET_GROUP_EXCHANGE_FOR_USER, (user_id,))
-
-            rows = result.fetchall()
-            if rows:
-                return rows
-            return None
+        return self._fetchall(queries.GET_GROUP_EXCHANGE_FOR_USER, (user_id,))
 
     def is_botonly(self, channel_id: int) -> bool:
         """Runs a query checking if a channel is marked as bot-only in the db.
@@ -532,11 +748,25 @@ class DatabaseConnector:
         Returns:
             bool: true if the channel is botonly, false if not or no entry is found
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            result = db_manager.execute(queries.IS_CHANNEL_BOTONLY, (channel_id,))
-            row = result.fetchone()
+        found, is_botonly, generation = _BOTONLY_CACHE.get(self._db_file, channel_id)
+        if found:
+            return is_botonly
+
+        row = self._fetchone(queries.IS_CHANNEL_BOTONLY, (channel_id,))
+        is_botonly = row is not None and bool(row["IsBotonly"])
+        _BOTONLY_CACHE.put(self._db_file, channel_id, is_botonly, generation)
+
+        return is_botonly
+
+    def get_botonly_channel_ids(self) -> List[int]:
+        """Gets the ids of all channels which are marked as bot-only in the db.
+
+        Returns:
+            List[int]: A list containing the ids of all bot-only channels.
+        """
+        rows = self._fetchall(queries.GET_ALL_BOTONLY_CHANNELS)
 
-            return bool(row[0])
+        return [int(row[0]) for row in rows]
 
     def activate_botonly(self, channel_id: int):
         """Executes a query that enables bot-only mode for a channel.
@@ -544,9 +774,17 @@ class DatabaseConnector:
         Args:
             channel_id (int): The id of the channel for which bot-only mode should be activated.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.ACTIVATE_BOTONLY_FOR_CHANNEL, (channel_id,))
-            db_manager.commit()
+        self._execute(queries.ACTIVATE_BOTONLY_FOR_CHANNEL, (channel_id,))
+        _BOTONLY_CACHE.invalidate(self._db_file, channel_id)
+
+    async def activate_botonly_async(self, channel_id: int):
+        """Same as `activate_botonly`, but the change is written by the batch writer without blocking the event loop.
+
+        Args:
+            channel_id (int): The id of the channel for which bot-only mode should be activated.
+        """
+        await self._write(queries.ACTIVATE_BOTONLY_FOR_CHANNEL, (channel_id,),
+                          functools.partial(_BOTONLY_CACHE.invalidate, self._db_file, channel_id))
 
     def deactivate_botonly(self, channel_id: int):
         """Executes a query that disables bot-only for a channel.
@@ -554,21 +792,74 @@ class DatabaseConnector:
         Args:
             channel_id (int): The id of the channel for which bot-only mode should be deactivated.
         """
-        with DatabaseManager(self._db_file) as db_manager:
-            db_manager.execute(queries.DEACTIVATE_BOTONLY_FOR_CHANNEL, (channel_id,))
-            db_manager.commit()
+        self._execute(queries.DEACTIVATE_BOTONLY_FOR_CHANNEL, (channel_id,))
+        _BOTONLY_CACHE.invalidate(self._db_file, channel_id)
 
-    @staticmethod
-    def parse_sql_file(filename: str) -> List[str]:
-        """Parses a SQL script to read all queries/commands it contains.
+    async def deactivate_botonly_async(self, channel_id: int):
+        """Same as `deactivate_botonly`, but the change is written by the batch writer without blocking the event loop.
 
         Args:
-            filename (str): The filename of the init file. Can also be a path.
-
-        Returns:
-            List[str]: A list of strings with each entry being a SQL query.
+            channel_id (int): The id of the channel for which bot-only mode should be deactivated.
         """
-        file = open(filename, 'r')
-        sql_file = file.read()
-        file.close()
-        return sql_file.split(';')
+        await self._write(queries.DEACTIVATE_BOTONLY_FOR_CHANNEL, (channel_id,),
+                          functools.partial(_BOTONLY_CACHE.invalidate, self._db_file, channel_id))
+
+
+def _connect(db_file: str) -> sqlite3.Connection:
+    """Opens a new connection to the database in autocommit mode and configures it.
+
+    The statement cache of the connection is big enough to keep every query of the queries module prepared.
+
+    Args:
+        db_file (str): The filename of the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: The opened connection.
+    """
+    connection = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None,
+                                 cached_statements=_STATEMENT_CACHE_SIZE)
+    _configure_connection(connection)
+    return connection
+
+
+def _configure_connection(connection: sqlite3.Connection):
+    """Applies the settings needed for every connection to the database.
+
+    Rows are returned as `sqlite3.Row`, so their columns can be accessed by index as well as by name.
+
+    Args:
+        connection (sqlite3.Connection): The newly opened connection.
+    """
+    connection.row_factory = sqlite3.Row
+    connection.executescript(_PRAGMAS)
+
+
+def _encode_timestamp(timestamp: datetime.datetime) -> int:
+    """Converts a timestamp into the number of seconds since the epoch, which is how timestamps are stored.
+
+    Args:
+        timestamp (datetime.datetime): The timestamp to convert. Naive timestamps are treated as UTC.
+
+    Returns:
+        int: The unix timestamp.
+    """
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return int(timestamp.timestamp())
+
+
+def _decode_timestamp(value: Union[int, str]) -> datetime.datetime:
+    """Converts a stored timestamp back into an aware UTC datetime.
+
+    Besides unix timestamps, the ISO 8601 strings written by older versions of the bot are supported as well. Columns
+    created by them still have TEXT affinity, so unix timestamps may also be returned as strings.
+
+    Args:
+        value (Union[int, str]): The value read from the database.
+
+    Returns:
+        datetime.datetime: The decoded timestamp.
+    """
+    if isinstance(value, int) or value.isdigit():
+        return datetime.datetime.fromtimestamp(int(value), tz=datetime.timezone.utc)
+    return datetime.datetime.fromisoformat(value).replace(tzinfo=datetime.timezone.utc)
@@ -0,0 +1,100 @@
+"""Contains a cache for the results of point lookups in the database."""
+
+import collections
+import threading
+from typing import Any, Hashable, Tuple
+
+
+class LookupCache:
+    """Thread-safe LRU cache for the results of point lookups in the database.
+
+    The entries are keyed by the database file as well, so a single cache can be shared by all connectors. A lookup
+    which has been started before the cache got invalidated won't be stored afterwards, because its result might
+    already be outdated.
+    """
+
+    def __init__(self, maxsize: int):
+        """Creates an empty cache.
+
+        Args:
+            maxsize (int): The maximum number of entries kept by the cache.
+        """
+        self._maxsize = maxsize
+        self._entries: 'collections.OrderedDict[Tuple[str, Hashable], Any]' = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, db_file: str, key: Hashable) -> Tuple[bool, Any, int]:
+        """Looks up the cached value for the given key.
+
+        Args:
+            db_file (str): The filename of the SQLite database file.
+            key (Hashable): The key of the cached value.
+
+        Returns:
+            Tuple[bool, Any, int]: A flag indicating if the key has been found, the cached value and the current
+                                   generation of the cache which needs to be passed to `put` after a miss.
+        """
+        with self._lock:
+            try:
+                value = self._entries[(db_file, key)]
+            except KeyError:
+                return False, None, self._generation
+
+            self._entries.move_to_end((db_file, key))
+            return True, value, self._generation
+
+    def put(self, db_file: str, key: Hashable, value: Any, generation: int):
+        """Stores a value in the cache unless it has been invalidated since the given generation.
+
+        Args:
+            db_file (str): The filename of the SQLite database file.
+            key (Hashable): The key of the value.
+            value (Any): The value which should be cached.
+            generation (int): The generation of the cache returned by `get` before the value has been looked up.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._entries[(db_file, key)] = value
+            self._entries.move_to_end((db_file, key))
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def replace(self, db_file: str, key: Hashable, value: Any):
+        """Stores a value which has just been written to the database in the cache.
+
+        Args:
+            db_file (str): The filename of the SQLite database file.
+            key (Hashable): The key of the value.
+            value (Any): The value which should be cached.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries[(db_file, key)] = value
+            self._entries.move_to_end((db_file, key))
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, db_file: str, key: Hashable):
+        """Removes a value from the cache.
+
+        Args:
+            db_file (str): The filename of the SQLite database file.
+            key (Hashable): The key of the value.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.pop((db_file, key), None)
+
+    def clear(self, db_file: str):
+        """Removes all values belonging to a database from the cache.
+
+        Args:
+            db_file (str): The filename of the SQLite database file.
+        """
+        with self._lock:
+            self._generation += 1
+            for entry_key in [entry_key for entry_key in self._entries if entry_key[0] == db_file]:
+                del self._entries[entry_key]
@@ -1,7 +1,7 @@
 """This module contains template string constants which will be used for database queries and commands."""
 
 # Modmail
-INSERT_MODMAIL = "INSERT INTO Modmail (ID, Author, Timestamp) VALUES (?, ?, ?)"
+INSERT_MODMAIL = "INSERT INTO Modmail (ID, Author, Timestamp) VALUES (?, ?, ?) RETURNING StatusID"
 CHANGE_MODMAIL_STATUS = "UPDATE Modmail SET StatusID = ? WHERE ID = ?"
 GET_MODMAIL_STATUS = "SELECT StatusID FROM Modmail WHERE ID = ? LIMIT 1"
 GET_ALL_MODMAIL_WITH_STATUS = "SELECT ID, Author, Timestamp FROM Modmail WHERE StatusID = ?"
@@ -19,7 +19,7 @@ GET_SUGGESTION_BY_ID = "SELECT MessageID, StatusID, AuthorID FROM Suggestion WHE
 # Module Roles
 INSERT_MODULE_ROLE = "INSERT INTO ModuleRole (RoleID) VALUES (?)"
 REMOVE_MODULE_ROLE = "DELETE FROM ModuleRole WHERE RoleID = ?"
-CHECK_IF_MODULE_ROLE = "SELECT EXISTS(SELECT 1 FROM ModuleRole WHERE RoleID = ?)"
+CHECK_IF_MODULE_ROLE = "SELECT EXISTS(SELECT 1 FROM ModuleRole WHERE RoleID = ?) AS IsModuleRole"
 
 
 # Reaction Roles
@@ -29,7 +29,8 @@ REMOVE_REACTION_ROLE = "DELETE FROM ReactionRole WHERE MessageID = ? AND Emoji =
 CLEAR_REACTION_ROLES = "DELETE FROM ReactionRole WHERE MessageID = ?"
 INSERT_REACTION_ROLE_UNIQUENESS_GROUP = "INSERT INTO ReactionRoleUniquenessGroup (MessageID) VALUES (?)"
 REMOVE_REACTION_ROLE_UNIQUENESS_GROUP = "DELETE FROM ReactionRoleUniquenessGroup WHERE MessageID = ?"
-IS_REACTION_ROLE_UNIQUE = "SELECT EXISTS(SELECT 1 FROM ReactionRoleUniquenessGroup WHERE MessageID = ?)"
+IS_REACTION_ROLE_UNIQUE = "SELECT EXISTS(SELECT 1 FROM ReactionRoleUniquenessGroup WHERE MessageID = ?) " \
+                          "AS IsUnique"
 
 
 # Member Warnings
@@ -42,6 +43,7 @@ GET_MEMBER_WARNINGS = "SELECT ID, Timestamp, Reason FROM MemberWarning WHERE Use
 
 # Group Exchange
 INSERT_GROUP_OFFER = "INSERT INTO GroupOffer (UserId, Course, GroupNr) VALUES (?, ?, ?)"
+INSERT_GROUP_OFFER_WITH_MESSAGE = "INSERT INTO GroupOffer (UserId, Course, GroupNr, MessageId) VALUES (?, ?, ?, ?)"
 INSERT_GROUP_REQUEST = "INSERT INTO GroupRequest (UserId, Course, GroupNr) VALUES (?, ?, ?)"
 UPDATE_GROUP_MESSAGE_ID = "UPDATE GroupOffer SET MessageId = ? WHERE UserId = ? AND Course = ?"
 
@@ -53,11 +55,10 @@ FIND_GROUP_EXCHANGE_CANDIDATES = "SELECT DISTINCT offer.UserId, offer.MessageId,
                                  "WHERE offer.UserId != ? " \
                                  "AND offer.Course = ? " \
                                  "AND request.GroupNr = ? " \
-                                 "AND offer.GroupNr IN ({0})"
+                                 "AND offer.GroupNr IN (SELECT value FROM json_each(?))"
 
 GET_GROUP_EXCHANGE_MESSAGE = "SELECT MessageId FROM GroupOffer WHERE UserId = ? AND Course = ? LIMIT 1"
 REMOVE_GROUP_EXCHANGE_OFFER = "DELETE FROM GroupOffer WHERE UserId = ? AND Course = ?"
-REMOVE_GROUP_EXCHANGE_REQUESTS = "DELETE FROM GroupRequest WHERE UserId = ? AND Course = ?"
 GET_GROUP_EXCHANGE_FOR_USER = "SELECT DISTINCT offer.Course, offer.MessageId, offer.GroupNr, group_concat(request.GroupNr, ',') " \
                               "FROM GroupOffer offer INNER JOIN GroupRequest request " \
                               "ON offer.Course = request.Course " \
@@ -71,7 +72,8 @@ CLEAR_GROUP_EXCHANGE_REQUESTS = "DELETE FROM GroupRequest"
 
 
 # Bot-only Mode
-IS_CHANNEL_BOTONLY = "SELECT EXISTS(SELECT 1 FROM BotOnlyChannel WHERE ChannelID = ?)"
+IS_CHANNEL_BOTONLY = "SELECT EXISTS(SELECT 1 FROM BotOnlyChannel WHERE ChannelID = ?) AS IsBotonly"
+GET_ALL_BOTONLY_CHANNELS = "SELECT ChannelID FROM BotOnlyChannel"
 ACTIVATE_BOTONLY_FOR_CHANNEL = "INSERT INTO BotOnlyChannel (ChannelID) VALUES (?)"
 DEACTIVATE_BOTONLY_FOR_CHANNEL = "DELETE FROM BotOnlyChannel WHERE ChannelID = ?"
 
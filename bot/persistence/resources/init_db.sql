@@ -2,7 +2,7 @@ CREATE TABLE IF NOT EXISTS Modmail(
     ID TEXT PRIMARY KEY,
     Author TEXT NOT NULL,
     StatusID SMALLINT NOT NULL DEFAULT 1,
-    Timestamp TEXT NOT NULL
+    Timestamp INTEGER NOT NULL
 );
 
 CREATE TABLE IF NOT EXISTS Suggestion(
@@ -52,6 +52,11 @@ CREATE TABLE IF NOT EXISTS GroupOffer(
     UNIQUE (UserId, Course)
 );
 
+CREATE TRIGGER IF NOT EXISTS DeleteGroupRequestsOfOffer AFTER DELETE ON GroupOffer
+BEGIN
+    DELETE FROM GroupRequest WHERE UserId = OLD.UserId AND Course = OLD.Course;
+END;
+
 CREATE TABLE IF NOT EXISTS BotOnlyChannel(
     ChannelID TEXT PRIMARY KEY
 );
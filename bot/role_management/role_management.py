@@ -27,6 +27,11 @@ class RoleManagementCog(commands.Cog):
         # Channel instances
         self.ch_role = bot.get_guild(int(constants.SERVER_ID)).get_channel(int(constants.CHANNEL_ID_ROLES))
 
+    # A special method that is called when the cog gets unloaded. The connections to the database are closed only after
+    # all pending changes have been committed.
+    def cog_unload(self):
+        self.bot.loop.create_task(self._db_connector.close_async())
+
     @commands.group(name='module', invoke_without_command=True)
     @command_log
     async def toggle_module(self, ctx: commands.Context, *, str_modules: str):
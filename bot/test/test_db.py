@@ -1,7 +1,10 @@
 """Tests for the database and other persistence classes."""
 
+import asyncio
 import os
 import datetime
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from bot import constants
 from bot.moderation import ModmailStatus
 from bot.persistence import DatabaseConnector
@@ -10,13 +13,235 @@ from bot.persistence import DatabaseConnector
 def test_db():
     """Tests if inserts and reads from the database work.
 
-    Initializes the database, adds a single value, queries the same value by key and finally deletes the db file.
+    Initializes the database, adds a single value, queries the same value by key and finally closes the connection
+    and deletes the db file.
     Passes if the returned value is found (ie. not None) and equal to the original one.
     """
     conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
-    conn.add_modmail(47348382920304934, "PKlempe#001", datetime.datetime.now())
+    res_insert = conn.add_modmail(47348382920304934, "PKlempe#001", datetime.datetime.now())
     res = conn.get_modmail_status(47348382920304934)
 
+    conn.close()
     os.remove("./test.sqlite")
 
+    assert res_insert == ModmailStatus.OPEN
     assert res == ModmailStatus.OPEN
+
+
+def test_botonly_channels():
+    """Tests if the ids of all bot-only channels can be read from the database.
+
+    Initializes the database, marks two channels as bot-only, disables it for one of them again and finally deletes the
+    db file. Passes if only the id of the remaining bot-only channel is returned.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    conn.activate_botonly(47348382920304934)
+    conn.activate_botonly(47348382920304935)
+    conn.deactivate_botonly(47348382920304935)
+    res = conn.get_botonly_channel_ids()
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert res == [47348382920304934]
+
+
+def test_group_offer_rollback():
+    """Tests if a group exchange offer is stored as a whole or not at all.
+
+    Initializes the database, tries to add an offer whose requested groups contain a duplicate and finally closes the
+    connection and deletes the db file. Passes if the insertion fails and no part of the offer has been stored.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    try:
+        conn.add_group_offer_and_requests(47348382920304934, "47348382920304935", 1, [2, 2])
+    except sqlite3.IntegrityError:
+        is_rejected = True
+    else:
+        is_rejected = False
+    res = conn.get_group_exchange_message(47348382920304934, "47348382920304935")
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert is_rejected and res is None
+
+
+def test_botonly_cache_invalidation():
+    """Tests if cached bot-only lookups are invalidated by changes made through another connector.
+
+    Initializes two connectors for the same database, caches the status of a channel via the first one, enables bot-only
+    mode via the second one and finally deletes the db file. Passes if the first connector sees the new status.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    other_conn = DatabaseConnector("./test.sqlite", init_script=None)
+    res_before = conn.is_botonly(47348382920304934)
+    other_conn.activate_botonly(47348382920304934)
+    res_after = conn.is_botonly(47348382920304934)
+
+    other_conn.close()
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert not res_before and res_after
+
+
+def test_group_exchange_candidates():
+    """Tests if candidates for a group exchange are found based on the offered and requested groups.
+
+    Initializes the database, adds two matching offers and one offer for a group which hasn't been requested and
+    finally deletes the db file. Passes if only the matching offers are returned as candidates.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    conn.add_group_offer_and_requests(1, "MAT", 2, [1])
+    conn.add_group_offer_and_requests(2, "MAT", 3, [1])
+    conn.add_group_offer_and_requests(3, "MAT", 4, [1])
+    res = conn.get_candidates_for_group_exchange(4, "MAT", 1, [2, 3])
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert sorted(int(candidate[0]) for candidate in res) == [1, 2]
+
+
+def test_async_wrappers():
+    """Tests if the asynchronous wrappers write to the database.
+
+    Initializes the database, adds a modmail and changes its status via the asynchronous methods and finally deletes the
+    db file. Passes if the status read afterwards is the one set last.
+    """
+    async def submit_and_close_modmail(connector: DatabaseConnector):
+        await connector.add_modmail_async(47348382920304934, "PKlempe#001", datetime.datetime.now())
+        await connector.change_modmail_status_async(47348382920304934, ModmailStatus.CLOSED)
+
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    asyncio.run(submit_and_close_modmail(conn))
+    res = conn.get_modmail_status(47348382920304934)
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert res == ModmailStatus.CLOSED
+
+
+def test_remove_group_exchange_offer():
+    """Tests if removing a group exchange offer also removes the requests belonging to it.
+
+    Initializes the database, adds an offer, removes it again, adds a new offer for the same course with the same
+    requested group and finally deletes the db file. Passes if no unique constraint is violated by the second offer.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    conn.add_group_offer_and_requests(1, "MAT", 2, [1, 3])
+    conn.remove_group_exchange_offer(1, "MAT")
+    conn.add_group_offer_and_requests(1, "MAT", 4, [1])
+    res = list(conn.get_group_exchange_for_user(1))
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert len(res) == 1 and res[0][2] == 4 and res[0][3] == "1"
+
+
+def test_modmail_timestamp():
+    """Tests if the timestamp of a modmail is stored and read correctly.
+
+    Initializes the database, adds a modmail with a naive UTC timestamp like the ones used by discord.py, reads all
+    open modmail and finally deletes the db file. Passes if the returned timestamp is the same moment in UTC.
+    """
+    timestamp = datetime.datetime(2021, 4, 1, 12, 30, 15)
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    conn.add_modmail(47348382920304934, "PKlempe#001", timestamp)
+    res = list(conn.get_all_modmail_with_status(ModmailStatus.OPEN))
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert res == [("47348382920304934", "PKlempe#001", timestamp.replace(tzinfo=datetime.timezone.utc))]
+
+
+def test_concurrent_reads():
+    """Tests if reads from several threads see the changes made through the writer connection.
+
+    Initializes the database, marks a channel as bot-only, reads the ids of all bot-only channels from several threads
+    at once and finally deletes the db file. Passes if every thread returns the id of the channel.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    conn.activate_botonly(47348382920304934)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        res = list(executor.map(lambda _: conn.get_botonly_channel_ids(), range(8)))
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert res == [[47348382920304934]] * 8
+
+
+def test_batched_writes():
+    """Tests if concurrent writes via the asynchronous methods are committed independently of each other.
+
+    Initializes the database, enables bot-only mode for two channels and a second time for one of them at once, waits
+    for the batch to be flushed and finally deletes the db file. Passes if only the duplicate raised an error and both
+    channels have been stored.
+    """
+    async def activate_channels(connector: DatabaseConnector):
+        results = await asyncio.gather(connector.activate_botonly_async(47348382920304934),
+                                       connector.activate_botonly_async(47348382920304935),
+                                       connector.activate_botonly_async(47348382920304934),
+                                       return_exceptions=True)
+        await connector.flush()
+        return results
+
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    res = asyncio.run(activate_channels(conn))
+    channel_ids = conn.get_botonly_channel_ids()
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert res[0] is None and res[1] is None and isinstance(res[2], sqlite3.IntegrityError)
+    assert sorted(channel_ids) == [47348382920304934, 47348382920304935]
+
+
+def test_group_offer_with_message():
+    """Tests if a group exchange offer is stored together with the id of its message.
+
+    Initializes the database, adds an offer including the id of its message, tries to add a second offer for the same
+    course and finally deletes the db file. Passes if the second offer is rejected and the message id can be read.
+    """
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    conn.add_group_offer_and_requests_with_message(1, "MAT", 2, [1, 3], 47348382920304934)
+    try:
+        conn.add_group_offer_and_requests_with_message(1, "MAT", 4, [1], 47348382920304935)
+    except sqlite3.IntegrityError:
+        is_rejected = True
+    else:
+        is_rejected = False
+    res = conn.get_group_exchange_message(1, "MAT")
+
+    conn.close()
+    os.remove("./test.sqlite")
+
+    assert is_rejected and res == 47348382920304934
+
+
+def test_close_async():
+    """Tests if closing a connector asynchronously commits the pending batched writes first.
+
+    Initializes the database, queues a change via an asynchronous method without awaiting it, closes the connector and
+    reads the bot-only channels via a new connector before deleting the db file. Passes if the change has been stored.
+    """
+    async def activate_and_close(connector: DatabaseConnector):
+        task = asyncio.ensure_future(connector.activate_botonly_async(47348382920304934))
+        await asyncio.sleep(0)
+        await connector.close_async()
+        await task
+
+    conn = DatabaseConnector("./test.sqlite", init_script=constants.DB_INIT_SCRIPT)
+    asyncio.run(activate_and_close(conn))
+    other_conn = DatabaseConnector("./test.sqlite", init_script=None)
+    res = other_conn.get_botonly_channel_ids()
+
+    other_conn.close()
+    os.remove("./test.sqlite")
+
+    assert res == [47348382920304934]
@@ -5,7 +5,7 @@ import re
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
-from sqlite3 import IntegrityError
+from sqlite3 import Error, IntegrityError
 from typing import Dict, List, Optional, Union, Iterable, Tuple
 
 import discord
@@ -40,6 +40,11 @@ class UniversityCog(commands.Cog):
         # Adds jobs needed for reopening/closing the group exchange channel if they don't already exist.
         _initialize_scheduler_jobs()
 
+    # A special method that is called when the cog gets unloaded. The connections to the database are closed only after
+    # all pending changes have been committed.
+    def cog_unload(self):
+        self.bot.loop.create_task(self._db_connector.close_async())
+
     @commands.group(name="ufind", invoke_without_command=True)
     @command_log
     async def ufind(self, ctx: commands.Context):
@@ -169,10 +174,20 @@ class UniversityCog(commands.Cog):
             raise ValueError("The offered Group was part of the requested groups. Offered Group {0}, "
                              "Requested Groups: {1}".format(offered_group, requested_groups))
 
-        self._db_connector.add_group_offer_and_requests(ctx.author.id, channel.id, offered_group, requested_groups)
+        # Checked before the offer gets posted, so a duplicate doesn't show up in the channel even for a moment.
+        if self._db_connector.get_group_exchange_message(ctx.author.id, channel.id) is not None:
+            raise IntegrityError("The user already has an active group exchange offer for this course.")
+
         embed = _build_group_exchange_offer_embed(ctx.author, channel, offered_group, requested_groups)
         message = await self.ch_group_exchange.send(embed=embed)
-        self._db_connector.update_group_exchange_message_id(ctx.author.id, channel.id, message.id)
+
+        try:
+            self._db_connector.add_group_offer_and_requests_with_message(ctx.author.id, channel.id, offered_group,
+                                                                         requested_groups, message.id)
+        except Error:
+            # Without an entry in the db, the offer couldn't be removed anymore, which is why it must not stay visible.
+            await message.delete()
+            raise
 
         if ctx.channel != self.ch_group_exchange:
             await ctx.send(":white_check_mark: Dein Tauschangebot wurde erfolgreich erstellt!")